@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
 
 # Dashboard layout - must be first Streamlit command
 st.set_page_config(layout="wide", page_title="Student Dashboard")
@@ -12,12 +12,12 @@ st.title("Student Performance Dashboard")
 @st.cache_data
 def load_data():
     try:
-        profiles = pd.read_csv("student_profiles.csv")
-        assignments = pd.read_csv("student_assignments.csv")
-        attendance = pd.read_csv("student_attendance.csv")
-        remarks = pd.read_csv("student_remarks.csv")
-        scores = pd.read_csv("student_scores.csv")
-        summary = pd.read_csv("student_summary.csv")
+        profiles = pd.read_csv("student_profiles.csv", engine="pyarrow")
+        assignments = pd.read_csv("student_assignments.csv", engine="pyarrow")
+        attendance = pd.read_csv("student_attendance.csv", engine="pyarrow")
+        remarks = pd.read_csv("student_remarks.csv", engine="pyarrow")
+        scores = pd.read_csv("student_scores.csv", engine="pyarrow")
+        summary = pd.read_csv("student_summary.csv", engine="pyarrow")
         
         # Convert dates to datetime with error handling
         assignments['Deadline'] = pd.to_datetime(assignments['Deadline'], errors='coerce')
@@ -29,12 +29,78 @@ def load_data():
             if 'ID' in df.columns:
                 df['ID'] = df['ID'].astype(str)
         
+        # Index detail tables by ID so per-student lookups avoid full scans.
+        # Assignments stay ordered by deadline (missing dates last) so the
+        # upcoming ones are a slice found by binary search.
+        assignments = assignments.set_index('ID').sort_values('Deadline', kind='stable')
+        attendance = attendance.set_index('ID').sort_index()
+        remarks = remarks.set_index('ID').sort_index()
+        scores = scores.set_index('ID').sort_index()
+        
+        # Low-cardinality text columns as categoricals for cheaper filters and groupbys
+        for col in ['Class', 'Section', 'Gender']:
+            summary[col] = summary[col].astype('category')
+        for col in ['Subject', 'Term']:
+            scores[col] = scores[col].astype('category')
+        assignments['Subject'] = assignments['Subject'].astype('category')
+        for col in ['Remark', 'Teacher']:
+            remarks[col] = remarks[col].astype('category')
+        
         return profiles, assignments, attendance, remarks, scores, summary
     
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None, None, None, None, None, None
 
+# Filtered views keyed on the sidebar selection so unchanged filters reuse them.
+# Tables are passed as underscore args, which cache_data does not hash.
+@st.cache_data
+def get_filtered(cls, sec, gen, _summary, _scores, _attendance, _assignments, _remarks):
+    summary, scores, attendance, assignments, remarks = _summary, _scores, _attendance, _assignments, _remarks
+
+    # Combine all filters into one mask and select once; with no active
+    # filter the summary is used as-is (it is never mutated downstream)
+    filtered_summary = summary
+    if cls != "All" or sec != "All" or gen != "All":
+        mask = np.ones(len(summary), dtype=bool)
+        if cls != "All":
+            mask &= summary['Class'].values == cls
+        if sec != "All":
+            mask &= summary['Section'].values == sec
+        if gen != "All":
+            mask &= summary['Gender'].values == gen
+        filtered_summary = summary.loc[mask]
+
+    # Intersect on ID with a hash probe; keeps each table's row order
+    ids = set(filtered_summary['ID'])
+    return {
+        'summary': filtered_summary,
+        'scores': scores.loc[scores.index.isin(ids)],
+        'attendance': attendance.loc[attendance.index.isin(ids)],
+        'assignments': assignments.loc[assignments.index.isin(ids)],
+        'remarks': remarks.loc[remarks.index.isin(ids)],
+        'name_to_id': filtered_summary.set_index('Name')['ID'].sort_index(kind='stable'),
+    }
+
+# Rows of an ID-indexed table for one student (always a DataFrame)
+def rows_for_id(df, student_id):
+    if student_id in df.index:
+        return df.loc[[student_id]]
+    return df.iloc[0:0]
+
+# YYYY-MM-DD strings via numpy's datetime cast instead of per-row strftime;
+# missing dates stay missing rather than becoming 'NaT'
+def to_date_str(dates):
+    return np.where(dates.isna(), None, dates.to_numpy().astype('datetime64[D]').astype(str))
+
+# Present and total attendance days per student ID, summed in one pass
+@st.cache_data
+def attendance_totals(_attendance):
+    codes, ids = pd.factorize(_attendance.index)
+    present = np.bincount(codes, weights=_attendance['Present'].to_numpy(dtype=np.int32), minlength=len(ids))
+    total = np.bincount(codes, minlength=len(ids))
+    return dict(zip(ids, zip(present.astype(int).tolist(), total.tolist())))
+
 profiles, assignments, attendance, remarks, scores, summary = load_data()
 
 # Check if data loaded successfully
@@ -77,13 +143,13 @@ st.session_state.selected_gender = st.sidebar.selectbox(
 )
 
 # Apply filters
-filtered_summary = summary.copy()
-if st.session_state.selected_class != "All":
-    filtered_summary = filtered_summary[filtered_summary['Class'] == st.session_state.selected_class]
-if st.session_state.selected_section != "All":
-    filtered_summary = filtered_summary[filtered_summary['Section'] == st.session_state.selected_section]
-if st.session_state.selected_gender != "All":
-    filtered_summary = filtered_summary[filtered_summary['Gender'] == st.session_state.selected_gender]
+filtered = get_filtered(
+    st.session_state.selected_class,
+    st.session_state.selected_section,
+    st.session_state.selected_gender,
+    summary, scores, attendance, assignments, remarks
+)
+filtered_summary = filtered['summary']
 
 # Overview metrics with better formatting
 st.header("Overview Metrics")
@@ -93,7 +159,8 @@ col2.metric("Average Score", f"{filtered_summary['Average Score'].mean():.1f}" i
 col3.metric("Average Attendance", f"{filtered_summary['Attendance Rate'].mean()*100:.1f}%" if not filtered_summary.empty else "N/A")
 col4.metric("Average Submission Rate", f"{filtered_summary['Submission Rate'].mean()*100:.1f}%" if not filtered_summary.empty else "N/A")
 
-# Tabs for different views
+# Tabs for different views; tabs with widgets are fragments so interacting
+# with one tab reruns only that tab instead of the whole script
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["Summary", "Performance", "Attendance", "Assignments", "Remarks"])
 
 with tab1:
@@ -153,7 +220,11 @@ with tab1:
             )
             st.plotly_chart(fig, use_container_width=True)
 
-with tab2:
+@st.fragment
+def performance_tab(filtered):
+    filtered_summary = filtered['summary']
+    name_to_id = filtered['name_to_id']
+
     st.header("Academic Performance")
     
     if filtered_summary.empty:
@@ -161,9 +232,14 @@ with tab2:
     else:
         # Subject-wise performance with merged data
         st.subheader("Subject-wise Performance")
-        merged_scores = pd.merge(scores, filtered_summary[['ID']], on='ID', how='inner')
+        merged_scores = filtered['scores']
         if not merged_scores.empty:
-            subject_scores = merged_scores.groupby('Subject')['Score'].mean().reset_index()
+            # One pass over the scores; subject averages are rolled up from the
+            # small per-term sums and counts so they stay exact
+            term_stats = merged_scores.groupby(['Subject', 'Term'], observed=True)['Score'].agg(['sum', 'count'])
+            term_scores = (term_stats['sum'] / term_stats['count']).rename('Score').reset_index()
+            subject_stats = term_stats.groupby(level='Subject', observed=True).sum()
+            subject_scores = (subject_stats['sum'] / subject_stats['count']).rename('Score').reset_index()
             fig = px.bar(
                 subject_scores, 
                 x='Subject', 
@@ -176,7 +252,6 @@ with tab2:
         # Term-wise performance with better grouping
         st.subheader("Term-wise Performance")
         if not merged_scores.empty:
-            term_scores = merged_scores.groupby(['Subject', 'Term'])['Score'].mean().reset_index()
             fig = px.bar(
                 term_scores, 
                 x='Subject', 
@@ -195,22 +270,22 @@ with tab2:
         )
         
         if selected_student:
-            matching_students = filtered_summary[filtered_summary['Name'] == selected_student]
-            if matching_students.empty:
+            matching_ids = name_to_id.loc[[selected_student]] if selected_student in name_to_id.index else name_to_id.iloc[0:0]
+            if matching_ids.empty:
                 st.warning(f"No student found with the name {selected_student}")
             else:
                  # Handle if multiple students with same name
-                if len(matching_students) > 1:
+                if len(matching_ids) > 1:
                      # Let user select the correct ID if duplicates exist
                     selected_id = st.selectbox(
                         f"Multiple students named {selected_student} found. Please select ID:",
-                        matching_students['ID'].tolist()
+                        matching_ids.tolist()
                     )
                 else:
-                    selected_id = matching_students['ID'].values[0]
+                    selected_id = matching_ids.iloc[0]
 
                 # Now filter scores by selected_id
-                student_scores = scores[scores['ID'] == selected_id]
+                student_scores = rows_for_id(scores, selected_id)
                 if not student_scores.empty:
                     fig = px.bar(
                         student_scores, 
@@ -225,8 +300,14 @@ with tab2:
                 else:
                     st.warning(f"No score data available for {selected_student} (ID: {selected_id})")
 
+with tab2:
+    performance_tab(filtered)
+
+@st.fragment
+def attendance_tab(filtered):
+    filtered_summary = filtered['summary']
+    name_to_id = filtered['name_to_id']
 
-with tab3:
     st.header("Attendance Analysis")
     
     if filtered_summary.empty:
@@ -247,15 +328,21 @@ with tab3:
         
         # Monthly attendance trend with proper date handling
         st.subheader("Monthly Attendance Trend")
-        filtered_attendance = pd.merge(attendance, filtered_summary[['ID']], on='ID', how='inner')
+        filtered_attendance = filtered['attendance']
         if not filtered_attendance.empty:
-            filtered_attendance['Month'] = filtered_attendance['Date'].dt.strftime('%Y-%m')
-            monthly_attendance = filtered_attendance.groupby(['Month', 'Present']).size().unstack().fillna(0)
-            monthly_attendance['Attendance Rate'] = monthly_attendance[True] / (monthly_attendance[True] + monthly_attendance[False])
+            # Positional arrays: crosstab would otherwise align on the duplicated ID index
+            month = filtered_attendance['Date'].dt.to_period('M')
+            monthly_attendance = pd.crosstab(
+                month.array,
+                filtered_attendance['Present'].array,
+                rownames=['Month'],
+                colnames=['Present']
+            )
+            monthly_attendance['Attendance Rate'] = monthly_attendance.get(True, 0) / monthly_attendance.sum(axis=1)
             
             fig = px.line(
                 monthly_attendance, 
-                x=monthly_attendance.index, 
+                x=monthly_attendance.index.astype(str), 
                 y='Attendance Rate',
                 title="Monthly Attendance Rate Trend",
                 labels={'Attendance Rate': 'Attendance Rate', 'index': 'Month'}
@@ -269,13 +356,12 @@ with tab3:
         )
         
         if selected_student_att:
-            student_id_att = filtered_summary[filtered_summary['Name'] == selected_student_att]['ID'].values[0]
-            student_attendance = attendance[attendance['ID'] == student_id_att]
+            student_id_att = name_to_id.loc[[selected_student_att]].iloc[0]
+            present_days, total_days = attendance_totals(attendance).get(student_id_att, (0, 0))
             
-            if not student_attendance.empty:
+            if total_days:
                 # Calculate present and absent days
-                present_days = student_attendance['Present'].sum()
-                absent_days = len(student_attendance) - present_days
+                absent_days = total_days - present_days
                 
                 fig = go.Figure(data=[
                     go.Pie(
@@ -289,7 +375,14 @@ with tab3:
             else:
                 st.warning(f"No attendance data available for {selected_student_att}")
 
-with tab4:
+with tab3:
+    attendance_tab(filtered)
+
+@st.fragment
+def assignments_tab(filtered):
+    filtered_summary = filtered['summary']
+    name_to_id = filtered['name_to_id']
+
     st.header("Assignments Analysis")
     
     if filtered_summary.empty:
@@ -297,12 +390,15 @@ with tab4:
     else:
         # Assignment completion rate by subject with filtered data
         st.subheader("Assignment Completion by Subject")
-        filtered_assignments = pd.merge(assignments, filtered_summary[['ID']], on='ID', how='inner')
+        filtered_assignments = filtered['assignments']
         if not filtered_assignments.empty:
-            completed_assignments = filtered_assignments[filtered_assignments['Submitted'] == True].groupby('Subject').size()
-            total_assignments = filtered_assignments.groupby('Subject').size()
-            completion_rate = (completed_assignments / total_assignments * 100).reset_index()
-            completion_rate.columns = ['Subject', 'Completion Rate']
+            completion_rate = (
+                filtered_assignments.groupby('Subject', observed=True)['Submitted']
+                .mean()
+                .mul(100)
+                .rename('Completion Rate')
+                .reset_index()
+            )
             
             fig = px.bar(
                 completion_rate, 
@@ -316,13 +412,17 @@ with tab4:
         # Upcoming deadlines with better date formatting
         st.subheader("Upcoming Deadlines")
         if not filtered_assignments.empty:
-            upcoming = filtered_assignments[filtered_assignments['Deadline'] >= datetime.now()]
+            deadlines = filtered_assignments['Deadline']
+            # The probe must match the Deadline column's unit, whatever that is
+            unit = np.datetime_data(deadlines.dtype)[0]
+            now = pd.Timestamp.now().floor(unit).as_unit(unit)
+            upcoming = filtered_assignments.iloc[deadlines.searchsorted(now):deadlines.count()]
             if not upcoming.empty:
-                upcoming_display = upcoming[['Assignment', 'Subject', 'Deadline', 'Submitted', 'Marks']].sort_values('Deadline')
-                upcoming_display['Deadline'] = upcoming_display['Deadline'].dt.strftime('%Y-%m-%d')
+                upcoming_display = upcoming[['Assignment', 'Subject', 'Deadline', 'Submitted', 'Marks']].reset_index(drop=True)
+                upcoming_display['Deadline'] = to_date_str(upcoming_display['Deadline'])
                 st.dataframe(
-                    upcoming_display.head(10).style.applymap(
-                        lambda x: 'color: green' if x == True else ('color: red' if x == False else ''), 
+                    upcoming_display.head(10).style.apply(
+                        lambda col: np.where(col, 'color: green', 'color: red'),
                         subset=['Submitted']
                     )
                 )
@@ -336,8 +436,8 @@ with tab4:
         )
         
         if selected_student_assign:
-            student_id_assign = filtered_summary[filtered_summary['Name'] == selected_student_assign]['ID'].values[0]
-            student_assignments = assignments[assignments['ID'] == student_id_assign]
+            student_id_assign = name_to_id.loc[[selected_student_assign]].iloc[0]
+            student_assignments = rows_for_id(assignments, student_id_assign)
             
             if not student_assignments.empty:
                 # Submitted vs not submitted
@@ -373,7 +473,14 @@ with tab4:
             else:
                 st.warning(f"No assignment data available for {selected_student_assign}")
 
-with tab5:
+with tab4:
+    assignments_tab(filtered)
+
+@st.fragment
+def remarks_tab(filtered):
+    filtered_summary = filtered['summary']
+    name_to_id = filtered['name_to_id']
+
     st.header("Teacher Remarks")
     
     if filtered_summary.empty:
@@ -381,15 +488,15 @@ with tab5:
     else:
         # Remarks distribution with filtered data
         st.subheader("Remarks Distribution")
-        filtered_remarks = pd.merge(remarks, filtered_summary[['ID']], on='ID', how='inner')
+        filtered_remarks = filtered['remarks']
         if not filtered_remarks.empty:
-            remark_counts = filtered_remarks['Remark'].value_counts().reset_index()
-            remark_counts.columns = ['Remark', 'Count']
+            # Categorical value_counts also lists unused remarks; drop those
+            remark_counts = filtered_remarks['Remark'].value_counts()
+            remark_counts = remark_counts[remark_counts > 0]
             
             fig = px.pie(
-                remark_counts, 
-                values='Count', 
-                names='Remark', 
+                values=remark_counts.values, 
+                names=remark_counts.index.astype(str), 
                 title="Distribution of Teacher Remarks",
                 hole=0.4
             )
@@ -402,16 +509,17 @@ with tab5:
         )
         
         if selected_student_remark:
-            student_id_remark = filtered_summary[filtered_summary['Name'] == selected_student_remark]['ID'].values[0]
-            student_remarks = remarks[remarks['ID'] == student_id_remark].sort_values('Date', ascending=False)
+            student_id_remark = name_to_id.loc[[selected_student_remark]].iloc[0]
+            student_remarks = rows_for_id(remarks, student_id_remark).sort_values('Date', ascending=False).reset_index(drop=True)
             
             if not student_remarks.empty:
-                student_remarks['Date'] = student_remarks['Date'].dt.strftime('%Y-%m-%d')
+                student_remarks['Date'] = to_date_str(student_remarks['Date'])
                 st.dataframe(
                     student_remarks[['Date', 'Teacher', 'Remark']]
-                    .style.applymap(
-                        lambda x: 'color: green' if x == 'Excellent' else (
-                            'color: orange' if x == 'Good' else 'color: red'
+                    .style.apply(
+                        lambda col: np.where(
+                            col == 'Excellent', 'color: green',
+                            np.where(col == 'Good', 'color: orange', 'color: red')
                         ),
                         subset=['Remark']
                     )
@@ -419,7 +527,7 @@ with tab5:
                 
                 # Remarks over time with better date handling
                 st.subheader("Remarks Over Time")
-                remark_trend = student_remarks.groupby(['Date', 'Remark']).size().unstack().fillna(0)
+                remark_trend = student_remarks.groupby(['Date', 'Remark'], observed=True).size().unstack().fillna(0)
                 fig = px.line(
                     remark_trend, 
                     x=remark_trend.index, 
@@ -431,6 +539,9 @@ with tab5:
             else:
                 st.warning(f"No remarks available for {selected_student_remark}")
 
+with tab5:
+    remarks_tab(filtered)
+
 # Download option with filtered data
 st.sidebar.header("Data Export")
 if st.sidebar.button("Download Filtered Data"):